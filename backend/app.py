@@ -1,10 +1,13 @@
 import os
+import tempfile
 import pandas as pd
 import numpy as np
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 import joblib
 import logging
+import sklearn
+from sklearn.neighbors import BallTree, KDTree
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
 # Configure logging
@@ -13,6 +16,7 @@ logger = logging.getLogger(__name__)
 
 # --- Global Variables & Constants ---
 model = None
+comparables_index = None
 REQUIRED_COLUMNS = [
     'longitude', 'latitude', 'housing_median_age', 'total_rooms',
     'total_bedrooms', 'population', 'households', 'median_income',
@@ -23,6 +27,21 @@ OCEAN_PROXIMITY_OPTIONS = [
     '<1H OCEAN', 'INLAND', 'ISLAND', 'NEAR BAY', 'NEAR OCEAN'
 ]
 
+HIST_BINS = 15
+SCATTER_SAMPLE_SIZE = 500
+SCATTER_SEED = 42
+ANALYTICS_CHUNK_SIZE = 5000
+
+BASE_DIR = os.path.join(os.path.dirname(__file__), '..')
+COMPARABLES_DATA_PATH = os.path.join(BASE_DIR, 'data', 'Data_file - data_file.csv')
+COMPARABLES_INDEX_PATH = os.path.join(BASE_DIR, 'models', 'comparables_index.joblib')
+COMPARABLE_FEATURES = [col for col in REQUIRED_COLUMNS if col != 'ocean_proximity']
+COMPARABLE_MODES = ['geo', 'features']
+DEFAULT_COMPARABLES_K = 5
+MAX_COMPARABLES_K = 50
+MAX_COMPARABLES_RESULTS = 50000  # query rows x k per request
+EARTH_RADIUS_KM = 6371.0
+
 # --- Helper Functions ---
 
 def load_model():
@@ -33,6 +52,7 @@ def load_model():
         if os.path.exists(model_path):
             model = joblib.load(model_path)
             logger.info(f"Model loaded successfully from {model_path}")
+            load_comparables_index()
             return True
         else:
             logger.error(f"Model file not found at {model_path}")
@@ -41,6 +61,105 @@ def load_model():
         logger.error(f"Error loading model: {e}")
         return False
 
+def build_comparables_index():
+    """Builds the geo and feature-space neighbour indexes over the labelled data."""
+    data = pd.read_csv(COMPARABLES_DATA_PATH)
+    features = data[COMPARABLE_FEATURES].to_numpy(dtype=float)
+
+    # Impute missing values (e.g. total_bedrooms) with column medians for the
+    # tree only; the raw values are what gets returned to clients
+    medians = np.nanmedian(features, axis=0)
+    imputed = features.copy()
+    missing = np.isnan(imputed)
+    imputed[missing] = np.take(medians, np.nonzero(missing)[1])
+
+    mean = imputed.mean(axis=0)
+    scale = imputed.std(axis=0)
+    scale[scale == 0] = 1.0
+
+    coords = np.radians(data[['latitude', 'longitude']].to_numpy(dtype=float))
+    return {
+        'source_mtime': os.path.getmtime(COMPARABLES_DATA_PATH),
+        'sklearn_version': sklearn.__version__,
+        'geo_tree': BallTree(coords, metric='haversine'),
+        'feature_tree': KDTree((imputed - mean) / scale),
+        'feature_medians': medians,
+        'feature_mean': mean,
+        'feature_scale': scale,
+        'features': features,
+        'house_values': data['median_house_value'].to_numpy(dtype=float),
+        'ocean_proximity': data['ocean_proximity'].to_numpy(dtype=object),
+    }
+
+def load_comparables_index():
+    """Loads the comparables index, memory-mapped from disk, building it if stale."""
+    global comparables_index
+    if os.path.exists(COMPARABLES_INDEX_PATH):
+        try:
+            index = joblib.load(COMPARABLES_INDEX_PATH, mmap_mode='r')
+            if (index.get('source_mtime') == os.path.getmtime(COMPARABLES_DATA_PATH)
+                    and index.get('sklearn_version') == sklearn.__version__):
+                comparables_index = index
+                logger.info(f"Comparables index loaded from {COMPARABLES_INDEX_PATH}")
+                return True
+            logger.info("Comparables index is stale, rebuilding")
+        except Exception as e:
+            # Truncated, corrupt or incompatible caches are simply rebuilt
+            logger.warning(f"Could not load comparables index, rebuilding: {e}")
+
+    try:
+        comparables_index = build_comparables_index()
+        try:
+            # Write to a temp file and swap it in, so workers that already
+            # memory-map the old cache keep reading the old inode
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(COMPARABLES_INDEX_PATH),
+                                            prefix='comparables_index.', suffix='.tmp')
+            os.close(fd)
+            try:
+                joblib.dump(comparables_index, tmp_path)
+                os.replace(tmp_path, COMPARABLES_INDEX_PATH)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            logger.info(f"Comparables index saved to {COMPARABLES_INDEX_PATH}")
+        except OSError as e:
+            # Read-only deployments (e.g. serverless) keep the in-memory index
+            logger.warning(f"Could not save comparables index: {e}")
+        return True
+    except Exception as e:
+        logger.error(f"Error building comparables index: {e}")
+        comparables_index = None
+        return False
+
+def find_comparables(df, k=DEFAULT_COMPARABLES_K, mode='geo'):
+    """Returns the k most similar labelled properties for every row of df."""
+    index = comparables_index
+    k = min(k, len(index['house_values']))
+
+    if mode == 'geo':
+        coords = np.radians(df[['latitude', 'longitude']].to_numpy(dtype=float))
+        distances, indices = index['geo_tree'].query(coords, k=k)
+        distances = distances * EARTH_RADIUS_KM
+    else:
+        features = df[COMPARABLE_FEATURES].to_numpy(dtype=float)
+        missing = np.isnan(features)
+        features[missing] = np.take(index['feature_medians'], np.nonzero(missing)[1])
+        scaled = (features - index['feature_mean']) / index['feature_scale']
+        distances, indices = index['feature_tree'].query(scaled, k=k)
+
+    # Gather all neighbours at once into a (rows, k, columns) table
+    gathered = np.concatenate([
+        index['features'][indices],
+        index['house_values'][indices][..., np.newaxis],
+        distances[..., np.newaxis],
+    ], axis=2)
+    table = gathered.astype(object)
+    table[np.isnan(gathered)] = None
+    table = np.concatenate([table, index['ocean_proximity'][indices][..., np.newaxis]], axis=2)
+
+    columns = COMPARABLE_FEATURES + ['median_house_value', 'distance', 'ocean_proximity']
+    return [[dict(zip(columns, comparable)) for comparable in row] for row in table.tolist()]
+
 def validate_input(df):
     """Validates that the input DataFrame contains all required columns."""
     missing_cols = [col for col in REQUIRED_COLUMNS if col not in df.columns]
@@ -120,12 +239,233 @@ def detect_outliers(df, predictions):
     # detailed implementation omitted for brevity/stability, returning safe defaults
     return [], 0, 0
 
-def generate_insights(df, predictions, importance):
-    """Generates text insights based on data."""
+def compute_analytics(df, predictions, rng=None, hist_range=None):
+    """Computes a mergeable partial of all summary statistics in one pass.
+
+    Works directly on NumPy arrays (no DataFrame copies). Partials from
+    separate chunks can be combined with merge_analytics() and turned into
+    final values with finalize_analytics().
+
+    When processing chunks, pass each call an independent rng and the same
+    hist_range (see analyze_predictions()).
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    prices = np.asarray(predictions, dtype=float)
+    finite = np.isfinite(prices)
+    valid = prices[finite]
+    count = int(valid.size)
+
+    partial = {
+        'count': count,
+        'mean': 0.0,
+        'm2': 0.0,
+        'min': np.inf,
+        'max': -np.inf,
+        'hist_counts': np.zeros(HIST_BINS, dtype=np.int64),
+        'hist_edges': None,
+        'category_sums': {},
+        'category_counts': {},
+        'income': None,
+        'sample_keys': np.empty(0),
+        'sample_x': np.empty(0),
+        'sample_y': np.empty(0),
+    }
+    if count == 0:
+        return partial
+
+    # 1. Moments, range and histogram of the predicted prices
+    mean = float(valid.mean())
+    centered = valid - mean
+    partial['mean'] = mean
+    partial['m2'] = float(np.dot(centered, centered))
+    partial['min'] = float(valid.min())
+    partial['max'] = float(valid.max())
+    if hist_range is None:
+        hist_range = (partial['min'], partial['max'])
+    hist, edges = np.histogram(valid, bins=HIST_BINS, range=hist_range)
+    partial['hist_counts'] = hist.astype(np.int64)
+    partial['hist_edges'] = edges
+
+    # 2. Per-category sums and counts (NaN categories are dropped, as in groupby)
+    if 'ocean_proximity' in df.columns:
+        codes, uniques = pd.factorize(df['ocean_proximity'].to_numpy())
+        keep = finite & (codes >= 0)
+        sums = np.bincount(codes[keep], weights=prices[keep], minlength=len(uniques))
+        counts = np.bincount(codes[keep], minlength=len(uniques))
+        for label, total, n in zip(uniques, sums, counts):
+            if n:
+                partial['category_sums'][label] = float(total)
+                partial['category_counts'][label] = int(n)
+
+    # 3. Income co-moments and bottom-k (reservoir) scatter sample
+    if 'median_income' in df.columns:
+        income = df['median_income'].to_numpy(dtype=float)
+        pair = finite & np.isfinite(income)
+        x = income[pair]
+        y = prices[pair]
+        if x.size:
+            mean_x = float(x.mean())
+            mean_y = float(y.mean())
+            dx = x - mean_x
+            dy = y - mean_y
+            partial['income'] = {
+                'n': int(x.size),
+                'mean_x': mean_x,
+                'mean_y': mean_y,
+                'm2_x': float(np.dot(dx, dx)),
+                'm2_y': float(np.dot(dy, dy)),
+                'c_xy': float(np.dot(dx, dy)),
+            }
+
+            keys = rng.random(x.size)
+            if x.size > SCATTER_SAMPLE_SIZE:
+                idx = np.argpartition(keys, SCATTER_SAMPLE_SIZE)[:SCATTER_SAMPLE_SIZE]
+                idx.sort()
+            else:
+                idx = slice(None)
+            partial['sample_keys'] = keys[idx]
+            partial['sample_x'] = x[idx]
+            partial['sample_y'] = y[idx]
+
+    return partial
+
+def _merge_moments(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    """Combines count/mean/M2 of two partitions (Chan et al.)."""
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta * delta * n_a * n_b / n
+    return n, mean, m2
+
+def merge_analytics(a, b):
+    """Merges two partials produced by compute_analytics().
+
+    All statistics merge exactly. Both partials must have been built with
+    the same hist_range; histograms on different edges raise ValueError.
+    """
+    if a['count'] == 0:
+        return b
+    if b['count'] == 0:
+        return a
+
+    count, mean, m2 = _merge_moments(a['count'], a['mean'], a['m2'],
+                                     b['count'], b['mean'], b['m2'])
+    low = min(a['min'], b['min'])
+    high = max(a['max'], b['max'])
+
+    if not np.array_equal(a['hist_edges'], b['hist_edges']):
+        raise ValueError("Cannot merge histograms with different edges; "
+                         "pass the same hist_range to compute_analytics()")
+    hist_edges = a['hist_edges']
+    hist_counts = a['hist_counts'] + b['hist_counts']
+
+    category_sums = dict(a['category_sums'])
+    category_counts = dict(a['category_counts'])
+    for label, total in b['category_sums'].items():
+        category_sums[label] = category_sums.get(label, 0.0) + total
+        category_counts[label] = category_counts.get(label, 0) + b['category_counts'][label]
+
+    income = a['income'] or b['income']
+    if a['income'] and b['income']:
+        ia, ib = a['income'], b['income']
+        n = ia['n'] + ib['n']
+        dx = ib['mean_x'] - ia['mean_x']
+        dy = ib['mean_y'] - ia['mean_y']
+        _, mean_x, m2_x = _merge_moments(ia['n'], ia['mean_x'], ia['m2_x'],
+                                         ib['n'], ib['mean_x'], ib['m2_x'])
+        _, mean_y, m2_y = _merge_moments(ia['n'], ia['mean_y'], ia['m2_y'],
+                                         ib['n'], ib['mean_y'], ib['m2_y'])
+        income = {
+            'n': n,
+            'mean_x': mean_x,
+            'mean_y': mean_y,
+            'm2_x': m2_x,
+            'm2_y': m2_y,
+            'c_xy': ia['c_xy'] + ib['c_xy'] + dx * dy * ia['n'] * ib['n'] / n,
+        }
+
+    # Keeping the k smallest random keys across partials is an exact merge
+    keys = np.concatenate([a['sample_keys'], b['sample_keys']])
+    sample_x = np.concatenate([a['sample_x'], b['sample_x']])
+    sample_y = np.concatenate([a['sample_y'], b['sample_y']])
+    if keys.size > SCATTER_SAMPLE_SIZE:
+        idx = np.argpartition(keys, SCATTER_SAMPLE_SIZE)[:SCATTER_SAMPLE_SIZE]
+        keys, sample_x, sample_y = keys[idx], sample_x[idx], sample_y[idx]
+
+    return {
+        'count': count,
+        'mean': mean,
+        'm2': m2,
+        'min': low,
+        'max': high,
+        'hist_counts': hist_counts,
+        'hist_edges': hist_edges,
+        'category_sums': category_sums,
+        'category_counts': category_counts,
+        'income': income,
+        'sample_keys': keys,
+        'sample_x': sample_x,
+        'sample_y': sample_y,
+    }
+
+def analyze_predictions(df, predictions, chunk_size=ANALYTICS_CHUNK_SIZE):
+    """Runs the analytics stage over df in chunks and merges the partials."""
+    prices = np.asarray(predictions, dtype=float)
+
+    # Cheap min/max pre-pass so every chunk bins onto the same edges
+    valid = prices[np.isfinite(prices)]
+    hist_range = (float(valid.min()), float(valid.max())) if valid.size else None
+
+    n_chunks = max(1, -(-len(prices) // chunk_size))
+    seeds = np.random.SeedSequence(SCATTER_SEED).spawn(n_chunks)
+
+    partial = None
+    for i, seed in enumerate(seeds):
+        start, stop = i * chunk_size, (i + 1) * chunk_size
+        chunk = compute_analytics(df.iloc[start:stop], prices[start:stop],
+                                  rng=np.random.default_rng(seed), hist_range=hist_range)
+        partial = chunk if partial is None else merge_analytics(partial, chunk)
+    return finalize_analytics(partial)
+
+def finalize_analytics(partial):
+    """Turns a (possibly merged) partial into plain summary values."""
+    count = partial['count']
+    analytics = {'count': count}
+    if count == 0:
+        return analytics
+
+    analytics['mean'] = partial['mean']
+    analytics['std'] = float(np.sqrt(partial['m2'] / (count - 1))) if count > 1 else 0.0
+    analytics['min'] = partial['min']
+    analytics['max'] = partial['max']
+    analytics['hist_counts'] = partial['hist_counts']
+    analytics['hist_edges'] = partial['hist_edges']
+
+    if partial['category_counts']:
+        analytics['category_means'] = {
+            label: partial['category_sums'][label] / n
+            for label, n in partial['category_counts'].items()
+        }
+
+    income = partial['income']
+    if income:
+        denom = np.sqrt(income['m2_x'] * income['m2_y'])
+        analytics['income_correlation'] = float(income['c_xy'] / denom) if denom else float('nan')
+        analytics['scatter_x'] = partial['sample_x']
+        analytics['scatter_y'] = partial['sample_y']
+
+    return analytics
+
+def generate_insights(analytics, importance):
+    """Generates text insights from finalized analytics."""
     insights = []
-    
+    if analytics['count'] == 0:
+        return insights
+
     # 1. Average Price
-    avg_price = np.mean(predictions)
+    avg_price = analytics['mean']
     insights.append({
         'type': 'info',
         'icon': '💰',
@@ -134,8 +474,8 @@ def generate_insights(df, predictions, importance):
     })
 
     # 2. Price Range
-    min_price = np.min(predictions)
-    max_price = np.max(predictions)
+    min_price = analytics['min']
+    max_price = analytics['max']
     insights.append({
         'type': 'success',
         'icon': '📊',
@@ -144,11 +484,9 @@ def generate_insights(df, predictions, importance):
     })
 
     # 3. High Value Area Analysis (if ocean_proximity exists)
-    if 'ocean_proximity' in df.columns:
-        # Create a temp df for aggregation
-        temp_df = df.copy()
-        temp_df['predicted_price'] = predictions
-        expensive_loc = temp_df.groupby('ocean_proximity')['predicted_price'].mean().idxmax()
+    category_means = analytics.get('category_means')
+    if category_means:
+        expensive_loc = max(category_means, key=category_means.get)
         insights.append({
             'type': 'warning',
             'icon': '🌊',
@@ -157,8 +495,8 @@ def generate_insights(df, predictions, importance):
         })
 
     # 4. Income Correlation
-    if 'median_income' in df.columns:
-        correlation = np.corrcoef(df['median_income'], predictions)[0, 1]
+    if 'income_correlation' in analytics:
+        correlation = analytics['income_correlation']
         strength = "strong" if abs(correlation) > 0.7 else "moderate" if abs(correlation) > 0.4 else "weak"
         direction = "positive" if correlation > 0 else "negative"
         insights.append({
@@ -170,53 +508,59 @@ def generate_insights(df, predictions, importance):
 
     return insights
 
-def generate_graph_data(df):
-    """Generates data for frontend charts."""
+def generate_graph_data(analytics):
+    """Generates data for frontend charts from finalized analytics."""
     graphs = {}
+    if analytics['count'] == 0:
+        return graphs
 
     # 1. Price Histogram
-    # We need to bin the predicted prices
-    if 'predicted_price' in df.columns:
-        prices = df['predicted_price'].dropna()
-        # Create histogram with 15 bins
-        hist, bin_edges = np.histogram(prices, bins=15)
-        
-        # Format labels as ranges "100k-200k"
-        labels = []
-        for i in range(len(bin_edges) - 1):
-            start = bin_edges[i] / 1000
-            end = bin_edges[i+1] / 1000
-            labels.append(f"${int(start)}k-${int(end)}k")
-            
-        graphs['histogram'] = {
-            'labels': labels,
-            'values': hist.tolist()
-        }
-        
-        # Add summary stats
-        graphs['summary_stats'] = {
-            'total_properties': int(len(prices)),
-            'avg_price': float(prices.mean()),
-            'std_dev': float(prices.std()),
-            'min_price': float(prices.min()),
-            'max_price': float(prices.max())
-        }
-
-    # 2. Income vs Price Scatter
-    if 'median_income' in df.columns and 'predicted_price' in df.columns:
-        # Downsample if too many points to avoid lag
-        if len(df) > 500:
-            sample_df = df.sample(500, random_state=42)
-        else:
-            sample_df = df
-            
+    bin_edges = analytics['hist_edges']
+
+    # Format labels as ranges "100k-200k"
+    labels = []
+    for i in range(len(bin_edges) - 1):
+        start = bin_edges[i] / 1000
+        end = bin_edges[i+1] / 1000
+        labels.append(f"${int(start)}k-${int(end)}k")
+
+    graphs['histogram'] = {
+        'labels': labels,
+        'values': analytics['hist_counts'].tolist()
+    }
+
+    # Add summary stats
+    graphs['summary_stats'] = {
+        'total_properties': int(analytics['count']),
+        'avg_price': float(analytics['mean']),
+        'std_dev': float(analytics['std']),
+        'min_price': float(analytics['min']),
+        'max_price': float(analytics['max'])
+    }
+
+    # 2. Income vs Price Scatter (reservoir-sampled to avoid lag)
+    if 'scatter_x' in analytics:
         graphs['scatter'] = {
-            'x': sample_df['median_income'].tolist(),
-            'y': sample_df['predicted_price'].tolist()
+            'x': analytics['scatter_x'].tolist(),
+            'y': analytics['scatter_y'].tolist()
         }
 
     return graphs
 
+def clean_for_json(df):
+    """Replaces NaN/inf values with 0, rewriting only the affected columns."""
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if values.dtype.kind == 'f':
+            bad = ~np.isfinite(values)
+            if bad.any():
+                df[col] = np.where(bad, 0.0, values)
+        elif values.dtype.kind not in 'biu':
+            bad = pd.isna(values)
+            if bad.any():
+                df[col] = np.where(bad, 0, values.astype(object))
+    return df
+
 app = Flask(__name__, static_folder='../frontend/dist', static_url_path='')
 CORS(app, resources={r"/*": {"origins": "*"}})
 
@@ -240,7 +584,7 @@ def api_info():
     """API Info endpoint."""
     return jsonify({
         'message': 'House Price Prediction API Server',
-        'endpoints': ['/health', '/predict', '/predict-single', '/model-info'],
+        'endpoints': ['/health', '/predict', '/predict-single', '/model-info', '/comparables'],
         'status': 'running'
     })
 
@@ -297,6 +641,67 @@ def predict_single():
         logger.error(f"Error in single prediction: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/comparables', methods=['POST'])
+def comparables():
+    """Find the k most similar labelled properties for a JSON body or uploaded file."""
+    if comparables_index is None:
+        if not load_comparables_index():
+            return jsonify({'error': 'Comparables index is not available.'}), 503
+
+    mode = request.args.get('mode', 'geo')
+    if mode not in COMPARABLE_MODES:
+        return jsonify({'error': f"Invalid mode. Use one of: {', '.join(COMPARABLE_MODES)}"}), 400
+
+    try:
+        k = int(request.args.get('k', DEFAULT_COMPARABLES_K))
+    except ValueError:
+        return jsonify({'error': 'k must be an integer'}), 400
+    if not 1 <= k <= MAX_COMPARABLES_K:
+        return jsonify({'error': f'k must be between 1 and {MAX_COMPARABLES_K}'}), 400
+
+    try:
+        # Batch lookups come from an uploaded file, single lookups from JSON
+        if 'file' in request.files:
+            file = request.files['file']
+            if file.filename.endswith('.csv'):
+                df = pd.read_csv(file)
+            elif file.filename.endswith('.json'):
+                df = pd.read_json(file)
+            else:
+                return jsonify({'error': 'Invalid file format. Upload CSV or JSON.'}), 400
+        else:
+            data = request.get_json(silent=True)
+            if not data:
+                return jsonify({'error': 'No JSON data or file provided'}), 400
+            df = pd.DataFrame(data if isinstance(data, list) else [data])
+
+        required = ['latitude', 'longitude'] if mode == 'geo' else COMPARABLE_FEATURES
+        missing_cols = [col for col in required if col not in df.columns]
+        if missing_cols:
+            return jsonify({'error': f"Missing required columns: {', '.join(missing_cols)}"}), 400
+
+        if len(df) * k > MAX_COMPARABLES_RESULTS:
+            return jsonify({'error': f'Too many lookups: rows x k must not exceed {MAX_COMPARABLES_RESULTS}'}), 400
+
+        query = df[required].apply(pd.to_numeric, errors='coerce')
+        bad_cols = [col for col in required
+                    if ((query[col].isna() & df[col].notna()) | np.isinf(query[col])).any()]
+        if bad_cols:
+            return jsonify({'error': f"Non-numeric or infinite values in columns: {', '.join(bad_cols)}"}), 400
+        if query[['latitude', 'longitude']].isna().any().any():
+            return jsonify({'error': 'latitude and longitude must not be empty'}), 400
+        if (query['latitude'].abs() > 90).any() or (query['longitude'].abs() > 180).any():
+            return jsonify({'error': 'latitude must be within ±90 and longitude within ±180'}), 400
+
+        return jsonify({
+            'mode': mode,
+            'k': k,
+            'results': find_comparables(query, k=k, mode=mode)
+        })
+    except Exception as e:
+        logger.error(f"Error finding comparables: {e}")
+        return jsonify({'error': f"An error occurred: {str(e)}"}), 500
+
 @app.route('/predict', methods=['POST'])
 def predict():
     """Predict house prices from uploaded CSV/JSON file."""
@@ -345,11 +750,14 @@ def predict():
         # Feature importance
         importance = get_feature_importance()
 
+        # Chunked single-pass analytics over the prediction arrays
+        analytics = analyze_predictions(df, predictions)
+
         # Smart insights
-        insights = generate_insights(df, predictions, importance)
+        insights = generate_insights(analytics, importance)
 
         # Graph data
-        graph_data = generate_graph_data(df)
+        graph_data = generate_graph_data(analytics)
 
         # Model metrics (if actual values available)
         metrics = None
@@ -375,7 +783,7 @@ def predict():
             })
 
         # Clean NaN/inf values before JSON serialization
-        df = df.replace([np.inf, -np.inf], np.nan).fillna(0)
+        clean_for_json(df)
 
         # Build response
         response_data = {
@@ -32,6 +32,7 @@ const OCEAN_OPTIONS = ['<1H OCEAN', 'INLAND', 'ISLAND', 'NEAR BAY', 'NEAR OCEAN'
 const ScenarioSimulator = () => {
     const [inputs, setInputs] = useState(DEFAULTS);
     const [result, setResult] = useState(null);
+    const [comparables, setComparables] = useState([]);
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState(null);
 
@@ -52,6 +53,17 @@ const ScenarioSimulator = () => {
                 try { data = JSON.parse(data); } catch { break; }
             }
             setResult(data);
+
+            // Nearby labelled properties that justify the estimate (optional)
+            try {
+                const compResp = await axios.post(`${API_BASE_URL}/comparables?k=5&mode=geo`, inputs, {
+                    headers: { 'Content-Type': 'application/json' },
+                    responseType: 'json',
+                });
+                setComparables(compResp.data?.results?.[0] || []);
+            } catch {
+                setComparables([]);
+            }
         } catch (err) {
             setError(err.response?.data?.error || 'Prediction failed');
         }
@@ -141,6 +153,22 @@ const ScenarioSimulator = () => {
                     <p className="text-xs text-gray-500 mt-1">90% confidence</p>
                 </motion.div>
             )}
+
+            {result && comparables.length > 0 && (
+                <div className="mt-4 p-3 sm:p-4 rounded-xl bg-gray-900/50 border border-gray-700/50">
+                    <p className="text-xs sm:text-sm text-gray-400 mb-2">🏘️ Comparable Properties</p>
+                    <ul className="space-y-1">
+                        {comparables.map((comp, i) => (
+                            <li key={i} className="flex justify-between text-xs sm:text-sm">
+                                <span className="text-gray-400">
+                                    {comp.distance.toFixed(1)} km · {comp.ocean_proximity} · {comp.housing_median_age} yrs
+                                </span>
+                                <span className="text-green-400 font-mono">{formatCurrency(comp.median_house_value)}</span>
+                            </li>
+                        ))}
+                    </ul>
+                </div>
+            )}
         </div>
     );
 };